@@ -0,0 +1,39 @@
+# anyCAN library core: shared capture/transmit/logging engine behind the
+# anyCAN (multi test case) and anyCAN_Tx (single test case) front ends.
+#
+# Names are imported on first use, so e.g. `from anycan import read_write_messages`
+# does not load python-can, and nothing here loads pandas, openpyxl, tkinter
+# or keyboard until a function that needs them is called.
+
+_LAZY_IMPORTS = {
+    'CANEngine': 'engine',
+    'start_engine': 'engine',
+    'TestSuite': 'suite',
+    'init_can_interface': 'bus',
+    'send_single_message': 'bus',
+    'log_to_excel': 'log',
+    'CaptureStats': 'stats',
+    'TriggerEngine': 'trigger',
+    'TriggerRule': 'trigger',
+    'load_trigger_rules': 'trigger',
+    'load_trigger_engine': 'trigger',
+    'iter_test_case': 'testcase',
+    'read_write_messages': 'testcase',
+    'list_test_case_files': 'testcase',
+    'convert_excel_to_csv': 'testcase',
+    'ControlServer': 'remote',
+    'start_control_server': 'remote',
+}
+
+__all__ = list(_LAZY_IMPORTS)
+
+def __getattr__(name):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module 'anycan' has no attribute '{name}'")
+    import importlib
+    value = getattr(importlib.import_module(f".{_LAZY_IMPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,46 @@
+import time
+import can
+
+# Tx retries when the driver rejects a frame (e.g. transmit buffer full)
+TX_RETRIES = 3
+TX_RETRY_DELAY = 0.005
+
+# Function to initialize CAN interface
+def init_can_interface(channel, bitrate, interface='ixxat'):
+    bus = can.interface.Bus(channel=channel, interface=interface, bitrate=bitrate)
+    return bus
+
+# Function to send a single message onto the CANbus, counting Tx results in `stats`
+def send_single_message(bus, msg_id, dlc, data, stats=None, echo=True):
+    try:
+        msg = can.Message(
+            arbitration_id=int(msg_id, 16),
+            dlc=int(dlc),
+            data=[int(byte, 16) for byte in data.split()],
+            is_extended_id=False
+        )
+    except Exception as e:
+        print(f"Error sending message: {e}")
+        if stats:
+            stats.record_tx_failure()
+        return False
+
+    # Retry when the driver rejects the frame, counting retries and failures
+    for attempt in range(TX_RETRIES + 1):
+        try:
+            bus.send(msg)
+            if stats:
+                stats.record_tx(retries=attempt)
+            if echo:
+                print(f"Sent message with ID: {msg_id}, DLC: {dlc}, Data: {data}")
+            return True
+        except can.CanError as e:
+            error = e
+            time.sleep(TX_RETRY_DELAY)
+        except Exception as e:
+            error = e
+            break
+    print(f"Error sending message: {error}")
+    if stats:
+        stats.record_tx_failure(retries=attempt)
+    return False
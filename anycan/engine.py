@@ -0,0 +1,148 @@
+import os
+import can
+import time
+import threading
+from .bus import init_can_interface, send_single_message
+from .log import log_to_excel
+from .stats import CaptureStats
+from .testcase import read_write_messages
+from .trigger import TRIGGER_FILE, load_trigger_engine
+
+CAPTURE_JOIN_TIMEOUT = 2  # seconds, longer than the 1 s recv() timeout
+
+# Shared capture/transmit engine behind both front ends: one Rx thread that
+# logs (or feeds the trigger) and keeps the stats, plus the Tx helpers
+class CANEngine:
+    def __init__(self, bus, trigger=None, stats=None, echo=True, interface=None):
+        self.bus = bus
+        self.trigger = trigger
+        self.stats = stats or CaptureStats()
+        if interface:
+            self.stats.set_interface(interface)
+        self.echo = echo            # print every Rx/Tx frame to the terminal
+        self.messages = []
+        self.running = False
+        self.capturing = True       # ESC: pause/resume the CAN log
+        self.paused = False         # Ctrl+P: pause/resume the current Tx loop
+        self.capture_thread = None
+
+    # Start CAN message capture in a separate thread
+    def start(self):
+        self.running = True
+        self.capture_thread = threading.Thread(target=self.capture, daemon=True)
+        self.capture_thread.start()
+
+    # Continuously capture CAN log; while paused frames are still drained and counted, not logged
+    def capture(self):
+        # Gap rules have to be checked while the bus is quiet too, so wake up more often
+        recv_timeout = 0.1 if self.trigger and self.trigger.gap_rules else 1
+        while self.running:
+            try:
+                msg = self.bus.recv(timeout=recv_timeout)
+            except can.CanError as e:
+                # Overrun / bus-off are reported as exceptions: count them and keep capturing
+                self.stats.record_bus_error(e)
+                time.sleep(0.01)  # Don't spin if the driver keeps raising
+                continue
+            self.stats.check_bus_state(self.bus)
+            if msg is None:
+                if self.trigger and self.capturing:
+                    self.trigger.check_idle()
+                continue
+            self.stats.record(msg)
+            if not self.capturing:
+                continue
+            if self.echo:
+                print(f"Received: {msg}")
+            if self.trigger:
+                self.trigger.process(msg)  # Only the pre/post trigger window is kept
+            else:
+                self.messages.append(msg)
+
+    def toggle_capture(self):
+        if not self.capturing and self.trigger:
+            self.trigger.reset_gaps()  # No false gap triggers for the time spent paused
+        self.capturing = not self.capturing
+        print("Resuming CAN message capture..." if self.capturing else "Pausing CAN message capture...")
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        print("Paused" if self.paused else "Resumed")
+
+    def send(self, msg_id, dlc, data):
+        return send_single_message(self.bus, msg_id, dlc, data, stats=self.stats, echo=self.echo)
+
+    # Send (ID, DLC, Data, Delay) messages for `cycle_count` cycles, returns the result
+    def send_messages(self, write_messages, cycle_count=1, cycle_delay=0, should_stop=None):
+        result = {'sent': 0, 'status': 'completed'}
+        for cycle in range(cycle_count):
+            for msg_id, dlc, data, delay in write_messages:
+                while self.paused and not (should_stop and should_stop()):
+                    time.sleep(0.1)
+                if should_stop and should_stop():
+                    result['status'] = 'stopped'
+                    return result
+
+                if not self.send(msg_id, dlc, data):
+                    result['status'] = 'failed'
+                    result['error'] = f"Failed to send message {msg_id}"
+                    return result
+                result['sent'] += 1
+
+                if delay:
+                    time.sleep(delay / 1000.0)
+
+            time.sleep(cycle_delay / 1000.0)
+            print(f"Cycle {cycle + 1}/{cycle_count} completed.")
+        return result
+
+    # Send the Write messages of one test case file without the GUI
+    def run_test_case(self, file_path, cycle_count=1, cycle_delay=0, should_stop=None):
+        result = self.send_messages(read_write_messages(file_path), cycle_count, cycle_delay, should_stop)
+        result['test_case'] = os.path.basename(file_path)
+        return result
+
+    # Stop capturing and write out the log (or the open trigger window) with the stats
+    def stop(self, filename='can_messages.xlsx'):
+        self.running = False
+        # Let the Rx thread finish its last recv() so nothing reaches the trigger after close()
+        if self.capture_thread and self.capture_thread is not threading.current_thread():
+            self.capture_thread.join(timeout=CAPTURE_JOIN_TIMEOUT)
+        self.stats.close()
+        print("\nExiting CAN message capture...")
+        print(f"Capture stats: {self.stats.summary()}")
+
+        # Write out a trigger window still waiting for post-trigger frames
+        if self.trigger:
+            self.trigger.close()
+            print(f"{self.trigger.trigger_count} trigger(s) captured, "
+                  f"{self.trigger.suppressed_count} more fired inside an open window.")
+            log_to_excel([], 'can_stats.xlsx', self.stats)
+        # Log messages to Excel when exiting
+        elif self.messages:
+            log_to_excel(self.messages, filename, self.stats)
+        else:
+            print("No CAN messages captured.")
+            # Keep the Tx failures / bus state changes of a silent run
+            if self.stats.total or self.stats.tx_sent or self.stats.tx_failed or self.stats.bus_errors:
+                log_to_excel([], 'can_stats.xlsx', self.stats)
+
+# Function to open the CAN interface and start capturing, None on failure
+def start_engine(channel, bitrate, interface='ixxat', trigger_file=TRIGGER_FILE):
+    # Load trigger rules, if any, so only the traffic around each trigger is logged
+    try:
+        trigger = load_trigger_engine(trigger_file)
+    except ValueError as e:
+        print(f"Failed to load trigger rules: {e}")
+        return None
+
+    try:
+        bus = init_can_interface(channel, bitrate, interface)
+        print(f"CAN interface initialized on channel {channel} with baud rate {bitrate} bps")
+    except Exception as e:
+        print(f"Failed to initialize CAN interface: {e}")
+        return None
+
+    engine = CANEngine(bus, trigger=trigger, interface=interface)
+    engine.start()
+    return engine
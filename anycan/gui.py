@@ -0,0 +1,93 @@
+import time
+import threading
+import keyboard
+import tkinter as tk
+
+# Shared Tk / hotkey helpers for the anyCAN front ends (the engine itself never imports this)
+
+# Function to auto-format Data(hex) and auto-update DLC
+def auto_format_data(event, data_entry, dlc_entry):
+    data = data_entry.get().replace(" ", "").upper()  # Remove existing spaces and make uppercase
+    formatted_data = ' '.join([data[i:i+2] for i in range(0, len(data), 2)])  # Add space every 2 characters
+
+    data_entry.delete(0, tk.END)
+    data_entry.insert(0, formatted_data)
+
+    dlc_value = len(formatted_data.split())  # Count the number of bytes
+    dlc_entry.delete(0, tk.END)
+    dlc_entry.insert(0, str(dlc_value))
+
+# Function to create the table for entering up to `rows` messages, `widgets` is tk or ttk
+def create_message_table(window, widgets, rows=10):
+    headers = ["Select", "ID (hex)", "DLC", "Data (hex)", "Delay (ms)"]
+    for i, header in enumerate(headers):
+        widgets.Label(window, text=header).grid(row=0, column=i, padx=10, pady=10)
+
+    entries = []
+    for i in range(rows):
+        selected_var = tk.BooleanVar(value=True)
+        select_checkbox = widgets.Checkbutton(window, variable=selected_var)
+        select_checkbox.grid(row=i+1, column=0, padx=10, pady=5)
+
+        can_id_entry = widgets.Entry(window, width=10)
+        can_id_entry.grid(row=i+1, column=1, padx=10, pady=5)
+
+        dlc_entry = widgets.Entry(window, width=5)
+        dlc_entry.grid(row=i+1, column=2, padx=10, pady=5)
+
+        data_entry = widgets.Entry(window, width=30)
+        data_entry.grid(row=i+1, column=3, padx=10, pady=5)
+        data_entry.bind("<KeyRelease>",
+            lambda event, de=data_entry, dl=dlc_entry: auto_format_data(event, de, dl))
+
+        delay_entry = widgets.Entry(window, width=10)
+        delay_entry.grid(row=i+1, column=4, padx=10, pady=5)
+
+        entries.append((can_id_entry, dlc_entry, data_entry, delay_entry, selected_var))
+    return entries
+
+# Function to show the Write messages of a test case in the table
+def fill_entries(entries, write_messages):
+    for entry in entries:
+        for field in entry[:4]:  # Clear ID, DLC, Data and Delay fields
+            field.delete(0, tk.END)
+
+    for row_counter, (msg_id, dlc, data, delay) in enumerate(write_messages[:len(entries)]):
+        entries[row_counter][0].insert(0, msg_id)
+        entries[row_counter][1].insert(0, dlc)
+        entries[row_counter][2].insert(0, data)
+        entries[row_counter][3].insert(0, str(delay))
+
+# Function to read the selected table rows as (ID, DLC, Data, Delay) messages
+def read_entries(entries):
+    write_messages = []
+    for i, (can_id_entry, dlc_entry, data_entry, delay_entry, selected_var) in enumerate(entries):
+        msg_id, dlc, data, delay = can_id_entry.get(), dlc_entry.get(), data_entry.get(), delay_entry.get()
+        if selected_var.get() and msg_id and dlc and data:
+            try:
+                delay = int(delay) if delay else 0
+            except ValueError:
+                raise ValueError(f"Invalid delay value for message {i+1}.")
+            write_messages.append((msg_id, dlc, data, delay))
+    return write_messages
+
+# Function to send the selected table rows with the cycle settings, returns the result
+def send_entries(engine, entries, cycle_count, cycle_delay, should_stop=None):
+    try:
+        cycle_count = int(cycle_count)
+        cycle_delay = int(cycle_delay)
+    except ValueError:
+        raise ValueError("Invalid input for cycle count or cycle delay.")
+    return engine.send_messages(read_entries(entries), cycle_count, cycle_delay, should_stop)
+
+# Function to watch the ESC (pause CAN log) and Alt+S (open Tx GUI) hotkeys
+def monitor_keyboard(engine, open_gui):
+    while engine.running:
+        if keyboard.is_pressed('esc'):
+            engine.toggle_capture()
+            time.sleep(1)  # Debounce to prevent multiple toggles from one press
+        if keyboard.is_pressed('alt+s'):
+            print("Opening message sender window...")
+            threading.Thread(target=open_gui, daemon=True).start()
+            time.sleep(1)  # To debounce the 'Alt + S' key press
+        time.sleep(0.05)
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+# Function to log CAN messages into an Excel file with absolute time
+# (openpyxl is only imported when a log is actually written)
+def log_to_excel(messages, filename, stats=None):
+    import openpyxl
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = "CAN Messages"
+
+    # Set up column headers
+    headers = ['Timestamp', 'ID', 'DLC', 'Data', 'Delay (ms)', 'Type']
+    sheet.append(headers)
+
+    # Capture start time for absolute time calculation
+    start_time = datetime.now()
+
+    for msg in messages:
+        # Compute the absolute time
+        timestamp_seconds = msg.timestamp
+        absolute_time = start_time + timedelta(seconds=timestamp_seconds)
+        formatted_time = absolute_time.strftime('%d:%H:%M:%S')
+
+        msg_id = hex(msg.arbitration_id)
+        dlc = msg.dlc
+        data = ' '.join(format(byte, '02x') for byte in msg.data)
+        delay = msg.delay if hasattr(msg, 'delay') else 0
+        frame_type = 'error' if msg.is_error_frame else 'remote' if msg.is_remote_frame else 'data'
+        row = [formatted_time, msg_id, dlc, data, delay, frame_type]
+        sheet.append(row)
+
+    # Capture/Tx counters and bus state changes, to tell dropped frames from unsent ones
+    if stats:
+        stats_sheet = workbook.create_sheet("Capture Stats")
+        for name, value in stats.summary().items():
+            stats_sheet.append([name, value])
+        stats_sheet.append([])
+        stats_sheet.append(['ID', 'Count', 'Period (ms)', 'Suspected gaps'])
+        for msg_id, info in stats.snapshot()['ids'].items():
+            stats_sheet.append([msg_id, info['count'], info['period_ms'], info['suspected_gaps']])
+        stats_sheet.append([])
+        stats_sheet.append(['Time', 'Bus state (old)', 'Bus state (new)'])
+        for changed_at, old_state, new_state in stats.bus_state_changes:
+            stats_sheet.append([datetime.fromtimestamp(changed_at).strftime('%d:%H:%M:%S'), old_state, new_state])
+
+    # Save the Excel file
+    workbook.save(filename)
+    print(f"Data successfully logged to {filename}")
@@ -0,0 +1,234 @@
+import os
+import json
+import time
+import queue
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Default control server address (CONTROL_HOST = '0.0.0.0' to reach it from another machine)
+CONTROL_HOST = '127.0.0.1'
+CONTROL_PORT = 8750
+
+# Remote control / telemetry server (HTTP + JSON) for driving a bench without
+# hotkeys. Everything runs on its own daemon threads; the Rx/Tx threads only
+# ever touch the stats object and publish() which never block.
+#
+#   GET  /status          -> status()
+#   GET  /stats           -> stats.snapshot()
+#   GET  /events          -> newline-delimited JSON stream of published events
+#                            plus a 'stats' event every `stats_interval` seconds
+#   POST /<command>       -> commands[<command>](json_body), e.g. /start, /pause,
+#                            /resume, /stop, /folder {"path": "..."}
+class ControlServer:
+    def __init__(self, host, port, commands, status, stats, stats_interval=1.0):
+        self.commands = commands
+        self.status = status
+        self.stats = stats
+        self.stats_interval = stats_interval
+        self.subscribers = []
+        self.subscribers_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self):
+        return self.httpd.server_address
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"Control server listening on http://{self.address[0]}:{self.address[1]}")
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        # Wake up every /events stream; a stalled client's full queue is dropped, never waited on
+        with self.subscribers_lock:
+            for subscriber in self.subscribers:
+                try:
+                    while True:
+                        subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    subscriber.put_nowait(None)
+                except queue.Full:
+                    pass
+
+    # Push an event to every /events subscriber; slow subscribers lose events instead of blocking us
+    def publish(self, event, **data):
+        data['event'] = event
+        with self.subscribers_lock:
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(data)
+            except queue.Full:
+                pass
+
+    def _subscribe(self):
+        subscriber = queue.Queue(maxsize=1000)
+        with self.subscribers_lock:
+            self.subscribers.append(subscriber)
+        return subscriber
+
+    def _unsubscribe(self, subscriber):
+        with self.subscribers_lock:
+            self.subscribers.remove(subscriber)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass  # Keep the terminal for the CAN log
+
+            def _reply(self, code, body):
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                if self.path == '/status':
+                    self._reply(200, server.status())
+                elif self.path == '/stats':
+                    self._reply(200, server.stats.snapshot())
+                elif self.path == '/events':
+                    self._stream_events()
+                else:
+                    self._reply(404, {'error': f"Unknown path {self.path}"})
+
+            def do_POST(self):
+                command = server.commands.get(self.path.strip('/'))
+                if command is None:
+                    self._reply(404, {'error': f"Unknown command {self.path}"})
+                    return
+                try:
+                    length = int(self.headers.get('Content-Length') or 0)
+                    body = json.loads(self.rfile.read(length)) if length else {}
+                    if not isinstance(body, dict):
+                        raise ValueError("Request body must be a JSON object")
+                    self._reply(200, command(body))
+                except ValueError as e:
+                    self._reply(400, {'error': str(e)})
+                except Exception as e:
+                    self._reply(500, {'error': str(e)})
+
+            def _stream_events(self):
+                subscriber = server._subscribe()
+                try:
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.end_headers()
+                    next_stats = time.monotonic()
+                    while True:
+                        if time.monotonic() >= next_stats:
+                            event = dict(server.stats.snapshot(), event='stats')
+                            next_stats = time.monotonic() + server.stats_interval
+                        else:
+                            # Clamped: the thread may be preempted after the check above
+                            timeout = max(0.0, next_stats - time.monotonic())
+                            try:
+                                event = subscriber.get(timeout=timeout)
+                            except queue.Empty:
+                                continue
+                        if event is None:
+                            break
+                        self.wfile.write(json.dumps(event).encode() + b'\n')
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+                finally:
+                    server._unsubscribe(subscriber)
+
+        return Handler
+
+# Function to build the start/pause/resume/stop/folder commands that drive a
+# TestSuite headless on the engine; `on_stop` lets the front end stop its own loops
+def suite_commands(engine, suite, status, publish=None, on_stop=None):
+    def start(body):
+        cycle_count = _non_negative_int(body, 'cycle_count', 1)
+        cycle_delay = _non_negative_int(body, 'cycle_delay', 0)
+        # Only one sender at a time: concurrent /start calls or a GUI run on the same bus
+        if not suite.acquire('remote'):
+            raise ValueError(f"Test suite is already running ({suite.owner})")
+        try:
+            if 'folder' in body:
+                _set_folder(body['folder'])
+            if not suite.files:
+                raise ValueError("No test case folder selected")
+        except Exception:
+            suite.release()
+            raise
+        if suite.finished:
+            suite.index = 0
+        suite.running = True
+        threading.Thread(target=run, args=(cycle_count, cycle_delay), daemon=True).start()
+        return status()
+
+    def run(cycle_count, cycle_delay):
+        try:
+            suite.run(engine, cycle_count, cycle_delay, publish)
+        finally:
+            suite.release()
+
+    def pause(body):
+        engine.paused = True
+        print("Paused")
+        return status()
+
+    def resume(body):
+        engine.paused = False
+        print("Resumed")
+        return status()
+
+    def stop(body):
+        suite.stop()
+        engine.paused = False
+        if on_stop:
+            on_stop()
+        print("Test suite stopped")
+        return status()
+
+    def folder(body):
+        if suite.owner is not None:
+            raise ValueError(f"Cannot change folder while the test suite is running ({suite.owner})")
+        _set_folder(body.get('path'))
+        return status()
+
+    def _set_folder(path):
+        if not isinstance(path, str) or not os.path.isdir(path):
+            raise ValueError(f"Not a folder: {path}")
+        if not suite.set_folder(path):
+            raise ValueError(f"No test case files (.csv/.xlsx) found in {path}")
+
+    return {'start': start, 'pause': pause, 'resume': resume, 'stop': stop, 'folder': folder}
+
+# Function to read an optional non-negative integer from a request body
+def _non_negative_int(body, key, default):
+    value = body.get(key, default)
+    try:
+        if isinstance(value, bool) or int(value) != float(value):
+            raise ValueError
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a non-negative integer")
+    if value < 0:
+        raise ValueError(f"{key} must be a non-negative integer")
+    return value
+
+# Function to start a control server for a TestSuite on the engine, returns the server
+def start_control_server(engine, suite, host=CONTROL_HOST, port=CONTROL_PORT, status=None, on_stop=None):
+    if status is None:
+        status = lambda: dict(suite.status(), paused=engine.paused)
+
+    def publish(event, **data):
+        server.publish(event, **data)
+
+    commands = suite_commands(engine, suite, status, publish=publish, on_stop=on_stop)
+    server = ControlServer(host, port, commands, status, engine.stats)
+    engine.stats.on_event = server.publish  # Bus state changes go to the subscribers too
+    server.start()
+    return server
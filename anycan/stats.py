@@ -0,0 +1,197 @@
+import time
+import logging
+
+# SocketCAN error frame flags (error class in the ID, details in the data bytes);
+# only decoded when the interface is 'socketcan', other backends encode errors differently
+CAN_ERR_CRTL = 0x004
+CAN_ERR_BUSOFF = 0x040
+CAN_ERR_CRTL_OVERFLOW = 0x03  # data[1]: RX (0x01) / TX (0x02) buffer overflow
+
+# An ID counts as periodic after this many intervals in a row within PERIOD_JITTER
+# of its period; a periodic ID whose next interval exceeds GAP_FACTOR periods has a
+# suspected gap (dropped by us, or never sent - the stats cannot tell which)
+MIN_STABLE_INTERVALS = 20
+PERIOD_JITTER = 0.2
+GAP_FACTOR = 1.5
+
+# python-can backends that only report driver/controller overruns as log warnings
+OVERRUN_LOGGERS = {'ixxat': 'can.ixxat'}
+
+# How often the Rx thread polls bus.state (seconds)
+BUS_STATE_INTERVAL = 0.5
+
+# Live capture statistics: per-ID Rx counts, error/remote frames, bus state,
+# Tx failures/retries, overruns and suspected gaps in periodic IDs
+class CaptureStats:
+    def __init__(self, on_event=None):
+        self.on_event = on_event  # called as on_event(event, **data) on bus state changes
+        self.start_time = time.time()
+        self.total = 0
+        self.error_frames = 0
+        self.remote_frames = 0
+        self.overruns = 0
+        self.bus_off_frames = 0
+        self.bus_errors = 0         # errors raised by bus.recv()
+        self.suspected_gaps = 0
+        self.tx_sent = 0
+        self.tx_failed = 0
+        self.tx_retries = 0
+        self.interface = None
+        self.log_handler = None      # (logger, _OverrunLogHandler) while attached
+        self.bus_state = None
+        self.bus_state_changes = []  # (time, old state, new state)
+        self.next_state_check = 0
+        # arbitration_id -> [count, first_timestamp, last_timestamp, last_data, period,
+        #                    stable_intervals, suspected_gaps]
+        self.per_id = {}
+
+    # Called for every received frame, kept to a couple of dict operations
+    def record(self, msg):
+        self.total += 1
+        if msg.is_error_frame:
+            self._record_error_frame(msg)
+            return
+        if msg.is_remote_frame:
+            self.remote_frames += 1
+
+        timestamp = msg.timestamp
+        entry = self.per_id.get(msg.arbitration_id)
+        if entry is None:
+            self.per_id[msg.arbitration_id] = [1, timestamp, timestamp, msg.data, None, 0, 0]
+            return
+
+        interval = timestamp - entry[2]
+        period = entry[4]
+        if period is None:
+            period = interval
+        elif entry[5] >= MIN_STABLE_INTERVALS and interval > period * GAP_FACTOR:
+            # Gap in a proven periodic ID; it has to prove its period again afterwards
+            entry[6] += 1
+            self.suspected_gaps += 1
+            entry[5] = 0
+        elif period > 0 and abs(interval - period) <= period * PERIOD_JITTER:
+            entry[5] += 1
+            period += (interval - period) / 8.0  # Moving average of the period
+        else:
+            entry[5] = 0  # Not periodic (yet): restart the estimate
+            period = interval
+        entry[0] += 1
+        entry[2] = timestamp
+        entry[3] = msg.data
+        entry[4] = period
+
+    # Tell the stats which python-can interface is used, so overruns can be detected:
+    # SocketCAN from its error frames, ixxat from the warnings its driver logs
+    def set_interface(self, interface):
+        self.interface = interface
+        logger_name = OVERRUN_LOGGERS.get(interface)
+        logger = logging.getLogger(logger_name) if logger_name else None
+        if self.log_handler and self.log_handler[0] is not logger:
+            self.close()
+        if logger and not self.log_handler:
+            handler = _OverrunLogHandler(self)
+            logger.addHandler(handler)
+            self.log_handler = (logger, handler)
+
+    # Detach from the driver logger, otherwise it keeps this instance alive
+    def close(self):
+        if self.log_handler:
+            logger, handler = self.log_handler
+            logger.removeHandler(handler)
+            self.log_handler = None
+
+    def _record_error_frame(self, msg):
+        self.error_frames += 1
+        if self.interface != 'socketcan':
+            return
+        error_class = msg.arbitration_id
+        if error_class & CAN_ERR_BUSOFF:
+            self.bus_off_frames += 1
+        if error_class & CAN_ERR_CRTL and len(msg.data) > 1 and msg.data[1] & CAN_ERR_CRTL_OVERFLOW:
+            self.overruns += 1  # Controller/driver buffer overflow reported
+
+    # Poll the bus state (throttled) and record transitions such as ERROR_PASSIVE / bus-off
+    def check_bus_state(self, bus):
+        now = time.monotonic()
+        if now < self.next_state_check:
+            return
+        self.next_state_check = now + BUS_STATE_INTERVAL
+        try:
+            state = bus.state
+        except Exception:
+            return  # Interface does not report its state
+        self._set_bus_state(getattr(state, 'name', str(state)))
+
+    def _set_bus_state(self, state, old_state=None):
+        if state == self.bus_state:
+            return
+        old_state = self.bus_state or old_state
+        self.bus_state = state
+        if old_state is not None:
+            self.bus_state_changes.append((time.time(), old_state, state))
+            print(f"Bus state changed: {old_state} -> {state}")
+            if self.on_event:
+                self.on_event('bus_state', old=old_state, new=state)
+
+    # Errors raised by bus.recv(): e.g. ixxat raises "Data overrun occurred",
+    # "Error warning limit exceeded" and "Bus off status" instead of returning a frame
+    def record_bus_error(self, error):
+        self.bus_errors += 1
+        text = str(error).lower()
+        if 'overrun' in text:
+            self.overruns += 1
+        if 'bus off' in text or 'bus-off' in text:
+            self._set_bus_state('ERROR', old_state='ACTIVE')
+        print(f"CAN error: {error}")
+
+    def record_tx(self, retries=0):
+        self.tx_sent += 1
+        self.tx_retries += retries
+
+    def record_tx_failure(self, retries=0):
+        self.tx_failed += 1
+        self.tx_retries += retries
+
+    # Counters only, for the exit summary and the results file
+    def summary(self):
+        return {
+            'uptime_s': round(time.time() - self.start_time, 3),
+            'total': self.total,
+            'error_frames': self.error_frames,
+            'remote_frames': self.remote_frames,
+            'bus_off_frames': self.bus_off_frames,
+            'bus_errors': self.bus_errors,
+            'overruns': self.overruns,
+            'suspected_gaps': self.suspected_gaps,
+            'bus_state': self.bus_state,
+            'bus_state_changes': len(self.bus_state_changes),
+            'tx_sent': self.tx_sent,
+            'tx_failed': self.tx_failed,
+            'tx_retries': self.tx_retries,
+        }
+
+    # JSON-friendly copy of the current statistics
+    def snapshot(self):
+        ids = {}
+        for msg_id, (count, first, last, data, period, stable, gaps) in self.per_id.copy().items():
+            ids[hex(msg_id)] = {
+                'count': count,
+                'last_timestamp': last,
+                'period_ms': round(period * 1000.0, 3) if period is not None else None,
+                'periodic': stable >= MIN_STABLE_INTERVALS,
+                'suspected_gaps': gaps,
+                'last_data': ' '.join(format(byte, '02x') for byte in data),
+            }
+        snapshot = self.summary()
+        snapshot['ids'] = ids
+        return snapshot
+
+# Log handler counting the overrun warnings of a python-can backend (e.g. ixxat)
+class _OverrunLogHandler(logging.Handler):
+    def __init__(self, stats):
+        super().__init__(logging.WARNING)
+        self.stats = stats
+
+    def emit(self, record):
+        if 'overrun' in record.getMessage().lower():
+            self.stats.overruns += 1
@@ -0,0 +1,82 @@
+import os
+import threading
+from .testcase import list_test_case_files
+
+# A folder of test cases run one after the other (multi test case mode)
+class TestSuite:
+    def __init__(self):
+        self.files = []
+        self.folder = None
+        self.index = 0
+        self.running = False
+        self.owner = None           # who is sending the suite: 'remote', 'gui' or None
+        self.owner_lock = threading.Lock()
+
+    # Claim the suite for one sender (remote run, GUI auto/manual run), False if taken
+    def acquire(self, owner):
+        with self.owner_lock:
+            if self.owner is not None:
+                return False
+            self.owner = owner
+            return True
+
+    def release(self):
+        self.owner = None
+
+    # Function to use the test cases of a folder, False if it has none
+    def set_folder(self, folder_path):
+        files = list_test_case_files(folder_path)
+        if not files:
+            return False
+
+        self.files = files
+        self.folder = folder_path
+        self.index = 0
+        print(f"Found {len(self.files)} test case files")
+        return True
+
+    @property
+    def current(self):
+        return self.files[self.index] if self.index < len(self.files) else None
+
+    @property
+    def finished(self):
+        return self.index >= len(self.files)
+
+    # Run the remaining test cases without the GUI, publishing each result
+    def run(self, engine, cycle_count=1, cycle_delay=0, publish=None):
+        publish = publish or (lambda event, **data: None)
+        self.running = True
+
+        while self.running and not self.finished:
+            file_path = self.current
+            publish('test_case_started', test_case=os.path.basename(file_path),
+                    index=self.index, total=len(self.files))
+            try:
+                result = engine.run_test_case(file_path, cycle_count, cycle_delay,
+                                              should_stop=lambda: not self.running)
+            except Exception as e:
+                result = {'test_case': os.path.basename(file_path), 'status': 'error', 'error': str(e)}
+            publish('result', **result)
+            print(f"Test case {result['test_case']}: {result['status']}")
+
+            if result['status'] != 'completed':
+                break
+            self.index += 1
+
+        self.running = False
+        publish('suite_finished', completed=self.index, total=len(self.files))
+
+    def stop(self):
+        self.running = False
+
+    def status(self):
+        current = self.current
+        return {
+            'suite_running': self.running,
+            'run_by': self.owner,
+            'folder': self.folder,
+            'test_case_count': len(self.files),
+            'current_test_case_index': self.index,
+            'current_test_case': os.path.basename(current) if current else None,
+        }
@@ -0,0 +1,106 @@
+import os
+import csv
+import sys
+
+# Columns of a test case, same names as in the Excel test cases
+TEST_CASE_COLUMNS = ['ID', 'Data', 'Delay', 'Read/Write']
+TEST_CASE_EXTENSIONS = ('.csv', '.xlsx', '.xls')  # In order of precedence
+
+# Function to turn a cell value (str, int, float or empty) into clean text
+def _cell_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:  # NaN from empty Excel cells
+            return ''
+        if value.is_integer():
+            value = int(value)
+    return str(value).strip()
+
+# Function to convert a Delay cell into integer milliseconds (empty = 0)
+def _delay_ms(value):
+    text = _cell_text(value)
+    return int(float(text)) if text else 0
+
+# Function to stream the rows of a .csv test case as (ID, Data, Delay, Read/Write)
+def iter_csv_test_case(file_path):
+    with open(file_path, newline='', encoding='utf-8-sig') as f:  # Excel's "CSV UTF-8" adds a BOM
+        reader = csv.DictReader(f)
+        missing = [c for c in TEST_CASE_COLUMNS if c not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Missing column(s) {', '.join(missing)} in {os.path.basename(file_path)}")
+        for row in reader:
+            yield (_cell_text(row['ID']), _cell_text(row['Data']),
+                   _delay_ms(row['Delay']), _cell_text(row['Read/Write']))
+
+# Function to read the rows of an Excel test case (pandas is only imported here)
+def iter_excel_test_case(file_path):
+    import pandas as pd
+    df = pd.read_excel(file_path)
+    for row in df[TEST_CASE_COLUMNS].itertuples(index=False):
+        msg_id, data, delay, read_write = row
+        yield (_cell_text(msg_id), _cell_text(data), _delay_ms(delay), _cell_text(read_write))
+
+# Function to read any supported test case file as (ID, Data, Delay, Read/Write) rows
+def iter_test_case(file_path):
+    if file_path.lower().endswith('.csv'):
+        return iter_csv_test_case(file_path)
+    return iter_excel_test_case(file_path)
+
+# Function to get the Write messages of a test case as (ID, DLC, Data, Delay)
+def read_write_messages(file_path):
+    write_messages = []
+    for msg_id, data, delay, read_write in iter_test_case(file_path):
+        if read_write.lower() != 'write':
+            continue
+        dlc = len(data.replace(" ", "")) // 2  # Each byte is 2 hex characters
+        write_messages.append((msg_id, dlc, data, delay))
+    return write_messages
+
+# Function to list the test case files of a folder, sorted by name; when one test
+# case exists in several formats, .csv wins over .xlsx, and .xlsx over .xls
+def list_test_case_files(folder_path):
+    test_cases = {}
+    for f in os.listdir(folder_path):
+        name, ext = os.path.splitext(f)
+        ext = ext.lower()
+        if ext not in TEST_CASE_EXTENSIONS:
+            continue
+        rank = TEST_CASE_EXTENSIONS.index(ext)
+        if name not in test_cases or rank < test_cases[name][0]:
+            test_cases[name] = (rank, os.path.join(folder_path, f))
+    return sorted(path for rank, path in test_cases.values())
+
+# Function to convert an Excel test case into the .csv format
+def convert_excel_to_csv(excel_path, csv_path=None):
+    if csv_path is None:
+        csv_path = os.path.splitext(excel_path)[0] + '.csv'
+    rows = list(iter_excel_test_case(excel_path))
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(TEST_CASE_COLUMNS)
+        writer.writerows(rows)
+    print(f"Converted {os.path.basename(excel_path)} -> {csv_path} ({len(rows)} rows)")
+    return csv_path
+
+# Convert Excel test cases to .csv: python -m anycan.testcase <file.xlsx | folder> ...
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m anycan.testcase <test_case.xlsx | folder> ...")
+        return
+    for path in sys.argv[1:]:
+        if os.path.isdir(path):
+            excel_files = sorted(
+                os.path.join(path, f) for f in os.listdir(path)
+                if f.lower().endswith(('.xlsx', '.xls'))
+            )
+        else:
+            excel_files = [path]
+        for excel_path in excel_files:
+            try:
+                convert_excel_to_csv(excel_path)
+            except Exception as e:
+                print(f"Failed to convert {excel_path}: {e}")
+
+if __name__ == "__main__":
+    main()
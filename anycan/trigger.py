@@ -0,0 +1,310 @@
+import os
+import time
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+from .log import log_to_excel
+
+# Default trigger capture settings (only used when the rules file exists)
+TRIGGER_FILE = 'triggers.txt'
+PRE_TRIGGER_FRAMES = 1000
+POST_TRIGGER_FRAMES = 1000
+WRITE_QUEUE_SIZE = 16       # windows waiting for the writer before new ones are dropped
+
+# Rule kinds understood by the trigger engine / rules file
+RULE_KINDS = ('pattern', 'mask', 'gap', 'error')
+
+# Trigger rule: fires on a matching frame (or on a missing frame for 'gap' rules)
+class TriggerRule:
+    def __init__(self, kind, msg_id=None, pattern=None, mask=None, value=None, gap_ms=None):
+        if kind not in RULE_KINDS:
+            raise ValueError(f"Unknown trigger rule kind: {kind}")
+        self.kind = kind
+        self.msg_id = msg_id
+        self.pattern = pattern      # list of byte values, None = don't care
+        self.mask = mask            # bytes ANDed with the frame data ...
+        self.value = value          # ... and compared against these bytes
+        self.gap_ms = gap_ms
+
+    def matches(self, msg):
+        data = msg.data
+        if self.kind == 'error':
+            return msg.is_error_frame
+        if self.kind == 'pattern':
+            if len(data) < len(self.pattern):
+                return False
+            for expected, byte in zip(self.pattern, data):
+                if expected is not None and expected != byte:
+                    return False
+            return True
+        if self.kind == 'mask':
+            if len(data) < len(self.mask):
+                return False
+            for mask, value, byte in zip(self.mask, self.value, data):
+                if byte & mask != value:
+                    return False
+            return True
+        return False
+
+    def __str__(self):
+        if self.kind == 'error':
+            return "error frame"
+        if self.kind == 'gap':
+            return f"gap {hex(self.msg_id)} > {self.gap_ms} ms"
+        return f"{self.kind} {hex(self.msg_id)}"
+
+# Function to parse a hex byte string ("DE AD ?? EF" or "DEAD??EF") into a list
+def parse_hex_bytes(text, wildcard=False):
+    text = text.replace(" ", "")
+    if len(text) % 2:
+        raise ValueError(f"Odd number of hex digits: {text}")
+    result = []
+    for i in range(0, len(text), 2):
+        pair = text[i:i+2]
+        if wildcard and pair in ('??', 'XX', 'xx'):
+            result.append(None)
+        else:
+            result.append(int(pair, 16))
+    return result
+
+# Function to load trigger rules from a text file, one rule per line:
+#   pattern <id> <bytes, ?? = any>     e.g. pattern 0x123 DE AD ?? EF
+#   mask    <id> <mask> <value>        e.g. mask 0x123 FF00 1200
+#   gap     <id> <ms>                  e.g. gap 0x100 500
+#   error
+# Blank lines and anything after '#' are ignored.
+def load_trigger_rules(filename):
+    rules = []
+    with open(filename) as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            fields = line.split()
+            kind = fields[0].lower()
+            try:
+                if kind == 'error':
+                    rules.append(TriggerRule('error'))
+                elif kind == 'pattern':
+                    rules.append(TriggerRule('pattern', int(fields[1], 16),
+                                             pattern=parse_hex_bytes(''.join(fields[2:]), wildcard=True)))
+                elif kind == 'mask':
+                    mask = parse_hex_bytes(fields[2])
+                    value = parse_hex_bytes(fields[3])
+                    if len(mask) != len(value):
+                        raise ValueError("mask and value must have the same length")
+                    rules.append(TriggerRule('mask', int(fields[1], 16), mask=mask, value=value))
+                elif kind == 'gap':
+                    rules.append(TriggerRule('gap', int(fields[1], 16), gap_ms=int(fields[2])))
+                else:
+                    raise ValueError(f"unknown rule kind '{kind}'")
+            except (IndexError, ValueError) as e:
+                raise ValueError(f"{filename}:{line_no}: invalid trigger rule: {e}")
+    return rules
+
+# Trigger engine: keeps a fixed-size pre-trigger ring buffer and hands the
+# pre/post window around each trigger to `on_window(window, rule, count)`.
+class TriggerEngine:
+    def __init__(self, rules, on_window, pre_trigger=1000, post_trigger=1000):
+        self.on_window = on_window
+        self.post_trigger = post_trigger
+        self.pre_buffer = deque(maxlen=pre_trigger)
+
+        # ID-indexed rule table so each frame only checks the rules for its own ID
+        self.rules_by_id = {}
+        self.error_rules = []
+        self.gap_rules = []
+        for rule in rules:
+            if rule.kind == 'error':
+                self.error_rules.append(rule)
+            elif rule.kind == 'gap':
+                self.gap_rules.append(rule)
+            else:
+                self.rules_by_id.setdefault(rule.msg_id, []).append(rule)
+
+        # Gap tracking: last bus timestamp per watched ID and whether the gap already fired
+        self.last_seen = {}
+        self.gap_fired = {}
+        # Bus clock of the last frame and when it arrived, to estimate bus time while idle
+        self.last_bus_time = None
+        self.last_wall_time = None
+
+        self.window = None
+        self.window_rule = None
+        self.post_remaining = 0
+        self.trigger_count = 0
+        self.suppressed_count = 0   # rules that fired while a window was already open
+        self.lock = threading.Lock()  # process() runs on the Rx thread, flush() also on exit
+
+    # Feed one received frame through the engine, returns the rule that fired (if any)
+    def process(self, msg):
+        with self.lock:
+            return self._process(msg)
+
+    def _process(self, msg):
+        self.last_bus_time = msg.timestamp
+        self.last_wall_time = time.monotonic()
+        fired = None
+        if msg.is_error_frame:
+            if self.error_rules:
+                fired = self.error_rules[0]
+        else:
+            for rule in self.rules_by_id.get(msg.arbitration_id, ()):
+                if rule.matches(msg):
+                    fired = rule
+                    break
+        if self.gap_rules:
+            gap_rule = self._check_gaps(msg.timestamp, msg)
+            if fired is None:
+                fired = gap_rule
+
+        if self.window is not None:
+            self.window.append(msg)
+            self.post_remaining -= 1
+            if fired is not None:
+                self._suppress(fired)
+            if self.post_remaining <= 0:
+                self._flush()
+        elif fired is not None:
+            self._trigger(fired, msg)
+        else:
+            self.pre_buffer.append(msg)
+        return fired
+
+    # Called when no frame arrived (recv timeout), so a gap still fires on a quiet bus;
+    # the bus clock is estimated as the last frame's timestamp plus the time elapsed since
+    def check_idle(self):
+        with self.lock:
+            if not self.gap_rules or self.last_bus_time is None:
+                return None
+            now = self.last_bus_time + (time.monotonic() - self.last_wall_time)
+            fired = self._check_gaps(now)
+            if fired is not None:
+                if self.window is None:
+                    self._trigger(fired)
+                else:
+                    self._suppress(fired)
+            return fired
+
+    # Open a window: the pre-trigger frames plus the triggering frame (if any)
+    def _trigger(self, rule, msg=None):
+        self.trigger_count += 1
+        self.window = list(self.pre_buffer)
+        if msg is not None:
+            self.window.append(msg)
+        self.window_rule = rule
+        self.post_remaining = self.post_trigger
+        self.pre_buffer.clear()
+        print(f"Trigger #{self.trigger_count}: {rule}")
+        if self.post_remaining <= 0:
+            self._flush()
+
+    # A rule fired inside an open window: that window already holds the traffic
+    # around it, so it doesn't open a new one, but it is counted and logged
+    def _suppress(self, rule):
+        self.suppressed_count += 1
+        print(f"Trigger {rule} during window #{self.trigger_count} (kept in that window)")
+
+    # Gaps are measured on the bus clock (`now`): a watched ID fires once per gap,
+    # when it arrives late, when other traffic shows it is overdue, or from check_idle()
+    def _check_gaps(self, now, msg=None):
+        fired = None
+        for rule in self.gap_rules:
+            last = self.last_seen.get(rule.msg_id)
+            if last is not None and not self.gap_fired.get(rule.msg_id):
+                if (now - last) * 1000.0 > rule.gap_ms:
+                    self.gap_fired[rule.msg_id] = True
+                    if fired is None:
+                        fired = rule
+            if msg is not None and msg.arbitration_id == rule.msg_id and not msg.is_error_frame:
+                self.last_seen[rule.msg_id] = now
+                self.gap_fired[rule.msg_id] = False
+        return fired
+
+    # Forget gap tracking, e.g. after capture was paused: the watched IDs were not
+    # followed meanwhile, so they start over as if capture had just started
+    def reset_gaps(self):
+        with self.lock:
+            self.last_seen.clear()
+            self.gap_fired.clear()
+            self.last_bus_time = None
+            self.last_wall_time = None
+
+    # Hand the open window (if any) over to on_window, e.g. on exit
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    # Flush the open window and let on_window finish its work (e.g. pending writes)
+    def close(self):
+        self.flush()
+        close = getattr(self.on_window, 'close', None)
+        if close:
+            close()
+
+    def _flush(self):
+        if self.window is None:
+            return
+        window, rule = self.window, self.window_rule
+        self.window = None
+        self.window_rule = None
+        self.post_remaining = 0
+        self.on_window(window, rule, self.trigger_count)
+
+# on_window callback writing each window to its own Excel file from a single
+# writer thread, so the Rx thread never blocks on disk. If triggers keep firing
+# faster than the files can be written, windows beyond the queue are dropped.
+class ExcelWindowWriter:
+    def __init__(self, prefix='trigger', queue_size=WRITE_QUEUE_SIZE):
+        self.prefix = prefix
+        self.dropped = 0
+        self.closed = False
+        self.lock = threading.Lock()  # No window may be queued behind the stop sentinel
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __call__(self, window, rule, count):
+        filename = f"{self.prefix}_{count:04d}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        with self.lock:
+            if self.closed:
+                self.dropped += 1
+                print(f"Writer closed, dropped window of trigger #{count} ({rule})")
+                return
+            try:
+                self.queue.put_nowait((window, filename))
+                print(f"Writing {len(window)} frames around trigger #{count} ({rule}) to {filename}")
+            except queue.Full:
+                self.dropped += 1
+                print(f"Writer busy, dropped window of trigger #{count} ({rule})")
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            window, filename = item
+            try:
+                log_to_excel(window, filename)
+            except Exception as e:
+                print(f"Failed to write {filename}: {e}")
+
+    # Write the queued windows and stop the writer thread
+    def close(self):
+        with self.lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.queue.put(None)
+        self.thread.join()
+        if self.dropped:
+            print(f"{self.dropped} trigger window(s) dropped because the writer was busy or closed.")
+
+# Function to build a trigger engine from a rules file, None if the file does not exist
+def load_trigger_engine(filename=TRIGGER_FILE, pre_trigger=PRE_TRIGGER_FRAMES, post_trigger=POST_TRIGGER_FRAMES):
+    if not os.path.exists(filename):
+        return None
+    rules = load_trigger_rules(filename)
+    print(f"Loaded {len(rules)} trigger rule(s) from {filename}")
+    return TriggerEngine(rules, ExcelWindowWriter(), pre_trigger=pre_trigger, post_trigger=post_trigger)
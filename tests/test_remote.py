@@ -0,0 +1,124 @@
+import json
+import queue
+import threading
+import http.client
+
+import can
+import pytest
+
+from anycan.engine import CANEngine
+from anycan.remote import ControlServer, start_control_server
+from anycan.stats import CaptureStats
+from anycan.suite import TestSuite as Suite  # Aliased so pytest doesn't try to collect it
+
+# Control server tests on a virtual bus: the suite sends real frames, nothing is mocked
+
+
+def write_test_case(folder, name, rows):
+    lines = ['ID,Data,Delay,Read/Write'] + [f'{msg_id},{data},{delay},Write' for msg_id, data, delay in rows]
+    (folder / name).write_text('\n'.join(lines) + '\n')
+
+
+@pytest.fixture
+def bench(tmp_path):
+    bus = can.Bus(interface='virtual', channel='anycan-test', receive_own_messages=True)
+    engine = CANEngine(bus, echo=False)
+    engine.start()
+    suite = Suite()
+    server = start_control_server(engine, suite, port=0)
+    yield engine, suite, server, tmp_path
+    suite.stop()
+    server.shutdown()
+    engine.running = False
+    engine.capture_thread.join()
+    bus.shutdown()
+
+
+def request(server, method, path, body=None, raw=None):
+    conn = http.client.HTTPConnection(*server.address, timeout=5)
+    payload = raw if raw is not None else (json.dumps(body) if body is not None else None)
+    conn.request(method, path, body=payload, headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    result = response.status, json.loads(response.read())
+    conn.close()
+    return result
+
+
+def test_second_start_is_refused_while_running(bench):
+    engine, suite, server, folder = bench
+    write_test_case(folder, 'slow.csv', [('123', '11 22', 100)] * 20)
+
+    status, body = request(server, 'POST', '/start', {'folder': str(folder)})
+    assert status == 200
+    assert body['run_by'] == 'remote'
+
+    status, body = request(server, 'POST', '/start', {'folder': str(folder)})
+    assert status == 400
+    assert 'already running' in body['error']
+
+    status, body = request(server, 'POST', '/folder', {'path': str(folder)})
+    assert status == 400
+
+    request(server, 'POST', '/stop', {})
+
+
+@pytest.mark.parametrize('raw', ['[]', '"start"', '42', 'not json'])
+def test_start_rejects_non_object_bodies(bench, raw):
+    engine, suite, server, folder = bench
+    status, body = request(server, 'POST', '/start', raw=raw)
+    assert status == 400
+    assert suite.owner is None
+
+
+@pytest.mark.parametrize('cycle_count', [-1, 1.5, True, 'many'])
+def test_start_rejects_bad_cycle_count(bench, cycle_count):
+    engine, suite, server, folder = bench
+    write_test_case(folder, 'case.csv', [('123', '11', 0)])
+    status, body = request(server, 'POST', '/start', {'folder': str(folder), 'cycle_count': cycle_count})
+    assert status == 400
+    assert 'cycle_count' in body['error']
+    assert suite.owner is None
+
+
+def test_events_stream_reports_the_suite(bench):
+    engine, suite, server, folder = bench
+    write_test_case(folder, 'a.csv', [('100', '01 02', 0), ('101', '03', 0)])
+    write_test_case(folder, 'b.csv', [('200', 'AA', 0)])
+
+    conn = http.client.HTTPConnection(*server.address, timeout=5)
+    conn.request('GET', '/events')
+    stream = conn.getresponse()
+    assert stream.status == 200
+    assert json.loads(stream.readline())['event'] == 'stats'  # Sent right away
+
+    status, body = request(server, 'POST', '/start', {'folder': str(folder)})
+    assert status == 200
+
+    events = []
+    while not events or events[-1]['event'] != 'suite_finished':
+        event = json.loads(stream.readline())
+        if event['event'] != 'stats':
+            events.append(event)
+    conn.close()
+
+    assert [e['event'] for e in events] == ['test_case_started', 'result'] * 2 + ['suite_finished']
+    results = [e for e in events if e['event'] == 'result']
+    assert [(r['test_case'], r['status'], r['sent']) for r in results] == [
+        ('a.csv', 'completed', 2), ('b.csv', 'completed', 1)]
+    assert events[-1]['completed'] == 2
+    assert engine.stats.tx_sent == 3
+
+
+def test_shutdown_returns_with_a_full_subscriber_queue():
+    server = ControlServer('127.0.0.1', 0, {}, dict, CaptureStats())
+    server.start()
+    subscriber = server._subscribe()
+    while not subscriber.full():
+        server.publish('result', status='completed')
+
+    done = threading.Event()
+    threading.Thread(target=lambda: (server.shutdown(), done.set()), daemon=True).start()
+    assert done.wait(5)
+    assert subscriber.get_nowait() is None
+    with pytest.raises(queue.Empty):
+        subscriber.get_nowait()